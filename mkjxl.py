@@ -9,6 +9,7 @@ Features:
 - Automated prompt to "Sanitize & Retry" failed files after a batch.
 - Optional debug logging to a .txt file for troubleshooting.
 - Full customization of cjxl parameters (Quality, Effort).
+- Parallel conversions across a configurable number of worker threads.
 - Toggles for recursive search and deleting originals.
 - User-configurable output directory (defaults to ./converted).
 - Dynamic header that shows setup when idle and progress when converting.
@@ -26,9 +27,13 @@ import sys
 import curses
 import time
 import threading
-import queue
+import collections
+import concurrent.futures
 import shutil
+import signal
 import argparse
+import bisect
+import functools
 import subprocess
 import tempfile
 from pathlib import Path
@@ -75,52 +80,93 @@ class InputDialog:
             if key in [curses.KEY_BACKSPACE, 127]: self.text = self.text[:-1]
             elif 32 <= key <= 126: self.text += chr(key)
 
+class EnumeratedFiles:
+    """Lazy stand-in for list(enumerate(files)): rows are built on access, so only visible ones are materialized."""
+    def __init__(self, files): self.files = files
+    def __len__(self): return len(self.files)
+    def __getitem__(self, i): return (i, self.files[i])
+    def __iter__(self): return enumerate(self.files)
+
 class JxlConverterTUI:
+    _IMAGE_EXTS = ('.jpg', '.jpeg', '.png', '.gif', '.apng', '.tiff', '.tif')
+    # magick's exit code when cjxl stopped reading early: killed by SIGPIPE directly, or via a shell wrapper (128+13)
+    _BROKEN_PIPE_RCS = (-getattr(signal, 'SIGPIPE', 13), 128 + getattr(signal, 'SIGPIPE', 13))
+    _STATUS_COLOR_MAP = {'PENDING':5,'SELECTED':3,'QUEUED':8,'SKIPPED':5,'CONVERTING':7,'SUCCESS':2,'FAILED':4,'SANITIZING':7,'IGNORED':5}
+
     def __init__(self, stdscr, initial_dir):
         self.stdscr = stdscr; self.initial_dir = Path(initial_dir).resolve()
-        self.files = []; self.selected = set(); self.statuses = {}; self.failed_indices = set()
+        self.files = []; self.selected = set(); self.failed_indices = set()
+        self.selected_sorted = []; self.failed_sorted = []  # Kept in step with the sets above, in index order
         self.current_row = 0; self.scroll_offset = 0; self.status_message = ""; self.status_message_color = 5
-        self.quality = 90; self.effort = 7; self.recursive = False; self.delete_originals = False
+        self.quality = 90; self.effort = 7; self.workers = min(4, os.cpu_count() or 1); self.recursive = False; self.delete_originals = False
         self.show_only_failed = False; self.debug_enabled = False
         self.output_dir = Path.cwd() / "converted"
-        self.log_file = Path("jxl_converter_debug.txt")
-        self.conversion_queue = queue.Queue(); self.status_queue = queue.Queue()
-        self.conversion_thread = None; self.is_converting = False; self.stop_thread = threading.Event()
-        self.total_bytes_before = 0; self.total_bytes_after = 0
+        self.log_file = Path("jxl_converter_debug.txt"); self._log_fh = None; self._log_lock = threading.Lock()
+        self.status_queue = collections.deque()  # append/popleft are atomic; the UI thread polls, never blocks
+        self.executor = self._create_executor(); self.futures = []; self.is_converting = False
+        self.total_bytes_before = 0; self.total_bytes_after = 0; self._total_saved_str = self._format_bytes(0)
         self.conversions_success = 0; self.conversions_failed = 0; self.start_time = 0; self.last_conversion_summary = ""
         self.cjxl_cmd = shutil.which("cjxl"); self.imagemagick_cmd = shutil.which("magick") or shutil.which("convert")
         self.reprocessing_indices = set()  # Track which files are being reprocessed
         self.original_total_selected = 0   # Track original batch size for progress display
+        self._last_layout = None           # (terminal width, layout dict) of the last computed layout
+        self.needs_redraw = True           # Set by input/status changes; the main loop only redraws when needed
         curses.start_color()
         for i, (fg, bg) in enumerate([(curses.COLOR_BLACK, curses.COLOR_WHITE), (curses.COLOR_GREEN, curses.COLOR_BLACK),
                                       (curses.COLOR_YELLOW, curses.COLOR_BLACK), (curses.COLOR_RED, curses.COLOR_BLACK),
                                       (curses.COLOR_CYAN, curses.COLOR_BLACK), (curses.COLOR_BLACK, curses.COLOR_GREEN),
                                       (curses.COLOR_MAGENTA, curses.COLOR_BLACK), (curses.COLOR_BLUE, curses.COLOR_BLACK)], 1):
             curses.init_pair(i, fg, bg)
+        self._status_attrs = {name: curses.color_pair(c) for name, c in self._STATUS_COLOR_MAP.items()}
+        self._default_err_attr = curses.color_pair(4)
         self.load_files()
 
-    def _log_debug(self, message):
+    def _create_executor(self):
+        # Long-lived pool: sessions (including Sanitize & Retry) reuse the same warm worker threads.
+        return concurrent.futures.ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="jxl")
+
+    def _log_debug(self, message, flush=False):
         if not self.debug_enabled: return
         try:
-            if not self.log_file.exists():
-                header = f"TUI JXL Converter Debug Log\n\nSession started: {datetime.now().isoformat()}\n\n"
-                self.log_file.write_text(header, encoding="utf-8")
-            with self.log_file.open("a", encoding="utf-8") as f:
-                f.write(f"[{datetime.now().isoformat()}] {message}\n")
+            # One buffered handle for the whole session; workers log concurrently, hence the lock.
+            with self._log_lock:
+                if not self.debug_enabled: return  # Turned off (and closed) while we waited for the lock
+                if self._log_fh is None:
+                    self._log_fh = self.log_file.open("a", encoding="utf-8", buffering=64 * 1024)
+                    if self._log_fh.tell() == 0:
+                        self._log_fh.write(f"TUI JXL Converter Debug Log\n\nSession started: {datetime.now().isoformat()}\n\n")
+                self._log_fh.write(f"[{datetime.now().isoformat()}] {message}\n")
+                if flush: self._log_fh.flush()
         except OSError:
             self.debug_enabled = False; self.show_message("Error writing to debug log. Disabling.", 4)
 
+    def _flush_debug_log(self, close=False):
+        with self._log_lock:
+            if self._log_fh is None: return
+            try:
+                if close: self._log_fh.close()
+                else: self._log_fh.flush()
+            except OSError: pass
+            if close: self._log_fh = None
+
     def _update_status(self, idx, status, **kwargs):
-        self.status_queue.put({'idx': idx, 'status': status, **kwargs})
+        self.status_queue.append({'idx': idx, 'status': status, **kwargs})
 
     # Replace the existing _process_status_queue method with this updated version:
     def _process_status_queue(self):
         just_finished = False
-        while not self.status_queue.empty():
-            update = self.status_queue.get(); idx = update['idx']
-            if idx in self.statuses:
-                self.statuses[idx].update(update)
-                status = update.get('status')
+        # Drain everything first and merge updates per file, so a burst of events for the same
+        # file (e.g. CONVERTING -> SUCCESS) is applied and formatted only once.
+        latest = {}
+        while self.status_queue:
+            update = self.status_queue.popleft(); latest.setdefault(update['idx'], {}).update(update)
+        # Flush whenever results arrive so a hang or killed terminal loses at most one frame of log lines
+        if latest: self.needs_redraw = True; self._flush_debug_log()
+        for idx, update in latest.items():
+            if idx < len(self.st_status):
+                status = update['status']; self.st_status[idx] = status
+                if 'message' in update: self.st_message[idx] = update['message']
+                if 'size_after' in update: self.st_size_after[idx] = update['size_after']
 
                 info_text = ""
                 if status == 'SUCCESS':
@@ -128,6 +174,7 @@ class JxlConverterTUI:
                     b_before=update.get('size_before',0); b_after=update.get('size_after',0)
                     if b_before and b_after:
                         self.total_bytes_before += b_before; self.total_bytes_after += b_after
+                        self._total_saved_str = self._format_bytes(self.total_bytes_before - self.total_bytes_after)
                         savings=b_before-b_after; savings_pct=(savings/b_before*100) if b_before>0 else 0
                         info_text=f"{self._format_bytes(savings)} saved ({savings_pct:.1f}%)"
 
@@ -136,16 +183,17 @@ class JxlConverterTUI:
                         self.reprocessing_indices.remove(idx)
 
                 elif status == 'FAILED':
-                    self.conversions_failed += 1; self.failed_indices.add(idx)
+                    self.conversions_failed += 1; self._add_index(self.failed_indices, self.failed_sorted, idx)
                     info_text = update.get('message', 'Unknown Error')
 
                     # Remove from reprocessing set when failed
                     if idx in self.reprocessing_indices:
                         self.reprocessing_indices.remove(idx)
 
-                self.statuses[idx]['info_str'] = info_text
+                if info_text != self.st_info_str[idx]: self.st_trunc_cache[idx].clear()
+                self.st_info_str[idx] = info_text
 
-        if self.is_converting and self.conversion_queue.empty():
+        if self.is_converting:
             total_processed = self.conversions_success + self.conversions_failed
             # Check if we've completed all files from the original batch
             if total_processed >= self.original_total_selected:
@@ -160,7 +208,7 @@ class JxlConverterTUI:
                 else:
                     summary = f"Finished: {total_processed} files | Time: {elapsed:.2f}s"
                 self.last_conversion_summary = summary
-                just_finished = True
+                just_finished = True; self._flush_debug_log()
 
         if just_finished and self.failed_indices:
             self._prompt_for_sanitize()
@@ -172,9 +220,15 @@ class JxlConverterTUI:
         prompt = f"{len(self.failed_indices)} files failed. Sanitize & retry them now? (y/n)"
         if ConfirmationDialog(self.stdscr, prompt).run():
             self.show_message("Re-queueing failed files for sanitized conversion...")
-            self.selected = self.failed_indices.copy()
+            self.selected = self.failed_indices.copy(); self.selected_sorted = list(self.failed_sorted)
             self._start_conversion_session(is_sanitize_run=True)
 
+    def _add_index(self, index_set, sorted_list, idx):
+        if idx not in index_set: index_set.add(idx); bisect.insort(sorted_list, idx)
+
+    def _remove_index(self, index_set, sorted_list, idx):
+        if idx in index_set: index_set.remove(idx); del sorted_list[bisect.bisect_left(sorted_list, idx)]
+
     def _format_bytes(self, size_bytes):
         if size_bytes <= 0: return "0B"
         power=1024; n=0; power_labels={0:'', 1:'K', 2:'M', 3:'G', 4:'T'}
@@ -182,15 +236,35 @@ class JxlConverterTUI:
         return f"{size_bytes:.1f}{power_labels[n]}B"
 
     def load_files(self):
-        self.files.clear(); self.statuses.clear(); self.selected.clear(); self.failed_indices.clear()
+        self.selected.clear(); self.failed_indices.clear(); self.selected_sorted.clear(); self.failed_sorted.clear()
         self.current_row = 0; self.scroll_offset = 0
-        pattern = '**/*.*' if self.recursive else '*.*'
-        image_exts = {'.jpg', '.jpeg', '.png', '.gif', '.apng', '.tiff', '.tif'}
+        found_files = []
         try:
-            found_files = sorted([f for f in self.initial_dir.glob(pattern) if f.is_file() and f.suffix.lower() in image_exts], key=lambda p: p.name.lower())
-            self.files = found_files
-            for i in range(len(self.files)): self.statuses[i] = {'status': 'PENDING', 'message': '', 'info_str': ''}
-        except Exception as e: self.show_message(f"Error loading files: {e}", 4)
+            # Walk with scandir: type checks reuse readdir data (only symlinks need a stat), and names are filtered before any Path is built.
+            stack = [self.initial_dir]
+            while stack:
+                try: it = os.scandir(stack.pop())
+                except OSError: continue
+                with it:
+                    for e in it:
+                        if e.is_dir(follow_symlinks=False):
+                            if self.recursive: stack.append(e.path)
+                        elif e.is_file() and e.name.lower().endswith(self._IMAGE_EXTS):
+                            # is_file()/stat() follow symlinks so linked images are listed; recursion above does not.
+                            found_files.append((Path(e.path), e.stat()))
+            found_files.sort(key=lambda f: f[0].name.lower())
+        except Exception as e: found_files = []; self.show_message(f"Error loading files: {e}", 4)
+        self._reset_statuses(found_files)
+
+    def _reset_statuses(self, found_files):
+        # Per-file state lives in parallel lists indexed like self.files (one list per field).
+        n = len(found_files); self.files = [f for f, _ in found_files]
+        self.st_status = ['PENDING'] * n; self.st_message = [''] * n; self.st_info_str = [''] * n
+        self.st_target_path = [None] * n; self.st_size_after = [0] * n
+        self.st_stat = [st for _, st in found_files]  # Scan-time stat: source size, plus timestamps/mode copied onto the output
+        # Display caches for draw_file_list; st_trunc_cache maps (column, width[, selected]) -> display string.
+        self.st_name = [f.name for f in self.files]; self.st_target_name = [f.with_suffix('.jxl').name for f in self.files]
+        self.st_trunc_cache = [{} for _ in range(n)]
 
     # Replace the existing draw_header method with this updated version:
     def draw_header(self, h, w):
@@ -207,7 +281,7 @@ class JxlConverterTUI:
                 done = self.conversions_success + self.conversions_failed
                 elapsed_time = time.time() - self.start_time
                 time_str = time.strftime('%M:%S', time.gmtime(elapsed_time))
-                savings_str = f"Saved: {self._format_bytes(self.total_bytes_before - self.total_bytes_after)}"
+                savings_str = f"Saved: {self._total_saved_str}"
                 header_content = f"Converting: {done}/{total} | {savings_str} | Elapsed: {time_str}"
             elif self.last_conversion_summary:
                 header_content = self.last_conversion_summary
@@ -221,7 +295,9 @@ class JxlConverterTUI:
             self.stdscr.addstr(0, header_content_x, header_content[:available_width], curses.color_pair(8))
         except curses.error: pass
 
-    def _abbreviate_path(self, path, max_len):
+    @staticmethod
+    @functools.lru_cache(maxsize=16)  # Same (path, width) pairs are requested on every idle frame
+    def _abbreviate_path(path, max_len):
         path_str = str(path)
         if len(path_str) <= max_len: return path_str
         parts = path.parts
@@ -233,11 +309,13 @@ class JxlConverterTUI:
 
     def get_visible_files(self):
         if self.show_only_failed:
-            return [(i, self.files[i]) for i in sorted(list(self.failed_indices))]
-        return list(enumerate(self.files))
+            return [(i, self.files[i]) for i in self.failed_sorted]
+        return EnumeratedFiles(self.files)
 
     def draw_file_list(self, h, w, visible_files):
         layout = self._get_layout(); header_attr = curses.color_pair(2) | curses.A_BOLD
+        orig_w, preview_w, info_w = layout['orig_w'], layout['preview_w'], layout['info_w']
+        row_fmt, split = layout['row_fmt'], layout['preview_x'] - 2
         try:
             self.stdscr.addstr(1, 0, " " * (w - 1), header_attr)
             self.stdscr.addstr(1, 2, "Original", header_attr)
@@ -251,37 +329,49 @@ class JxlConverterTUI:
             y = 2 + i;
             if i + self.scroll_offset >= len(visible_files): break
             original_idx, file_path = visible_files[i + self.scroll_offset]
-            status_info = self.statuses.get(original_idx, {'status': 'ERROR'})
+            cache = self.st_trunc_cache[original_idx]
+            is_selected = original_idx in self.selected
             attr = curses.A_REVERSE if i + self.scroll_offset == self.current_row else curses.A_NORMAL
             try:
                 self.stdscr.addstr(y, 0, " " * (w-1), attr)
-                display_orig = (file_path.name[:layout['orig_w']-2]+'…') if len(file_path.name)>layout['orig_w']-1 else file_path.name
-                self.stdscr.addstr(y, 2, display_orig.ljust(layout['orig_w']), attr)
-                select_char = "*" if original_idx in self.selected else " "
-                target_path = status_info.get('target_path', file_path.with_suffix('.jxl'))
-                new_name = f"{select_char} {target_path.name}"
-                preview_attr = attr | (curses.color_pair(3) if original_idx in self.selected else 0)
-                display_new = (new_name[:layout['preview_w']-2]+'…') if len(new_name)>layout['preview_w']-1 else new_name
-                self.stdscr.addstr(y, layout['preview_x'], display_new.ljust(layout['preview_w']), preview_attr)
-
-                status_text = status_info.get('status', 'PENDING')
-                if original_idx in self.selected and status_text == 'PENDING': status_text = 'SELECTED'
-                color_map={'PENDING':5,'SELECTED':3,'QUEUED':8,'SKIPPED':5,'CONVERTING':7,'SUCCESS':2,'FAILED':4,'SANITIZING':7,'IGNORED':5}
-                status_color = color_map.get(status_text, 4)
-                self.stdscr.addstr(y, layout['status_x'], status_text.ljust(layout['status_w']), attr | curses.color_pair(status_color))
-
-                info_text = status_info.get('info_str', '')
-                display_info = (info_text[:layout['info_w']-2]+'…') if len(info_text)>layout['info_w']-1 else info_text
-                self.stdscr.addstr(y, layout['info_x'], display_info.ljust(layout['info_w']), attr | curses.color_pair(status_color))
+                display_orig = cache.get(('orig', orig_w))
+                if display_orig is None: display_orig = cache[('orig', orig_w)] = self._trunc(self.st_name[original_idx], orig_w)
+                display_new = cache.get(('preview', preview_w, is_selected))
+                if display_new is None:
+                    new_name = f"{'*' if is_selected else ' '} {self.st_target_name[original_idx]}"
+                    display_new = cache[('preview', preview_w, is_selected)] = self._trunc(new_name, preview_w)
+                # Original + Target columns share one attribute unless the row is selected
+                left = row_fmt.format(display_orig, display_new)
+                if is_selected:
+                    self.stdscr.addstr(y, 2, left[:split], attr)
+                    self.stdscr.addstr(y, layout['preview_x'], left[split:], attr | curses.color_pair(3))
+                else: self.stdscr.addstr(y, 2, left, attr)
+
+                status_text = self.st_status[original_idx]
+                if is_selected and status_text == 'PENDING': status_text = 'SELECTED'
+                status_attr = attr | self._status_attrs.get(status_text, self._default_err_attr)
+                self.stdscr.addstr(y, layout['status_x'], status_text.ljust(layout['status_w']), status_attr)
+
+                display_info = cache.get(('info', info_w))
+                if display_info is None: display_info = cache[('info', info_w)] = self._trunc(self.st_info_str[original_idx], info_w).ljust(info_w)
+                self.stdscr.addstr(y, layout['info_x'], display_info, status_attr)
             except curses.error: pass
 
+    def _trunc(self, text, width):
+        return (text[:width-2]+'…') if len(text)>width-1 else text
+
     def _get_layout(self):
         w = self.stdscr.getmaxyx()[1]
+        if self._last_layout is not None and self._last_layout[0] == w: return self._last_layout[1]
         info_w=24; status_w=12; sep_len=3; info_x=max(w-info_w,0); status_x=max(info_x-sep_len-status_w,0)
         orig_x=2; middle_area_w=max(status_x-sep_len-orig_x,0); orig_w=middle_area_w*2//5; preview_w=middle_area_w-orig_w
         preview_x=orig_x+orig_w+sep_len
-        return {'orig_w':max(0,orig_w),'preview_x':preview_x,'preview_w':max(0,preview_w),
-                'status_x':status_x,'status_w':max(0,status_w),'info_x':info_x,'info_w':max(0,info_w)}
+        layout = {'orig_w':max(0,orig_w),'preview_x':preview_x,'preview_w':max(0,preview_w),
+                  'status_x':status_x,'status_w':max(0,status_w),'info_x':info_x,'info_w':max(0,info_w)}
+        # Fixed-width template for the "Original   Target" part of a row, drawn from x=2
+        layout['row_fmt'] = "{:<%d}%s{:<%d}" % (layout['orig_w'], " " * sep_len, layout['preview_w'])
+        self._last_layout = (w, layout)
+        return layout
 
     def draw_status_bar(self, h, w):
         try:
@@ -304,7 +394,7 @@ class JxlConverterTUI:
             for i in range(2): self.stdscr.addstr(h-1-i, 0, " " * (w-1))
         except curses.error: return
         x = 2
-        toggles = [('Q',f"Qual:{self.quality}",False), ('E',f"Eff:{self.effort}",False), ('R',"Recur",self.recursive),
+        toggles = [('Q',f"Qual:{self.quality}",False), ('E',f"Eff:{self.effort}",False), ('W',f"Wrk:{self.workers}",False), ('R',"Recur",self.recursive),
                    ('D',"DelOrig",self.delete_originals), ('O',"Out Dir", self.output_dir is not None),
                    ('B', "Bug Log", self.debug_enabled)]
         if self.failed_indices: toggles.append(('F', "Filter Failed", self.show_only_failed))
@@ -319,18 +409,26 @@ class JxlConverterTUI:
         x = self._draw_key_helper(y_bot, x, "F5", "Refresh")
         quit_str = "(ESC/q) Quit"; self.stdscr.addstr(y_bot, w - len(quit_str) - 2, quit_str, curses.color_pair(2))
 
-    def _get_unique_target_path(self, in_path, existing_targets):
+    def _get_unique_target_path(self, in_path, existing_per_dir):
         target_dir = self.output_dir if self.output_dir is not None else in_path.parent
         if self.output_dir and self.recursive:
              try: target_dir = self.output_dir/in_path.parent.relative_to(self.initial_dir)
              except ValueError: pass
-        target_dir.mkdir(parents=True, exist_ok=True)
 
-        target_path = target_dir / f"{in_path.stem}.jxl"
+        # existing_per_dir maps target dir -> names on disk plus names already claimed in this batch,
+        # so each directory is created and listed once per session instead of stat()ing every candidate.
+        # Names are casefolded so case-insensitive filesystems (e.g. macOS) can't overwrite "Photo.jxl" with "photo.jxl".
+        existing = existing_per_dir.get(target_dir)
+        if existing is None:
+            target_dir.mkdir(parents=True, exist_ok=True)
+            with os.scandir(target_dir) as it: existing = existing_per_dir[target_dir] = {e.name.casefold() for e in it}
+
+        target_name = f"{in_path.stem}.jxl"
         counter = 1
-        while str(target_path) in existing_targets or target_path.exists():
-             target_path = target_dir / f"{in_path.stem}-{counter}.jxl"; counter += 1
-        return target_path
+        while target_name.casefold() in existing:
+             target_name = f"{in_path.stem}-{counter}.jxl"; counter += 1
+        existing.add(target_name.casefold())
+        return target_dir / target_name
 
     # Replace the existing _start_conversion_session method with this updated version:
     def _start_conversion_session(self, is_sanitize_run=False):
@@ -342,7 +440,7 @@ class JxlConverterTUI:
 
         self._log_debug("--- Preparing new conversion session ---")
         tasks = []
-        existing_targets_in_batch = set()
+        existing_per_dir = {}
 
         if is_sanitize_run:
             # For sanitize runs, mark these files as being reprocessed
@@ -350,7 +448,7 @@ class JxlConverterTUI:
             self.reprocessing_indices = self.selected.copy()
             # Subtract their previous contributions from totals
             for idx in self.selected:
-                if idx in self.statuses and self.statuses[idx].get('status') == 'FAILED':
+                if self.st_status[idx] == 'FAILED':
                     # Remove previous failed attempt from failed count
                     if self.conversions_failed > 0:
                         self.conversions_failed -= 1
@@ -362,94 +460,109 @@ class JxlConverterTUI:
             self.conversions_failed = 0
             self.total_bytes_before = 0
             self.total_bytes_after = 0
+            self._total_saved_str = self._format_bytes(0)
             self.original_total_selected = len(self.selected)
             self.reprocessing_indices = set()
 
-        for idx in sorted(list(self.selected)):
+        for idx in self.selected_sorted:
             input_path = self.files[idx]
-            target_path = self._get_unique_target_path(input_path, existing_targets_in_batch)
-            existing_targets_in_batch.add(str(target_path))
-            self.statuses[idx]['target_path'] = target_path
-            tasks.append({'idx': idx, 'target_path': target_path, 'sanitize': is_sanitize_run})
+            target_path = self._get_unique_target_path(input_path, existing_per_dir)
+            self.st_target_path[idx] = target_path; self.st_target_name[idx] = target_path.name; self.st_trunc_cache[idx].clear()
+            tasks.append({'idx': idx, 'input_path': input_path, 'target_path': target_path, 'sanitize': is_sanitize_run, 'src_stat': self.st_stat[idx]})
             self._log_debug(f"  - Queued Task: {input_path.name} -> {target_path.name}")
 
         for task in tasks:
-            self.conversion_queue.put(task)
             idx = task['idx']
-            self.statuses[idx]['status'] = 'QUEUED'
-            if idx in self.failed_indices: self.failed_indices.remove(idx)
+            self.st_status[idx] = 'QUEUED'
+            self._remove_index(self.failed_indices, self.failed_sorted, idx)
 
         # Start converting flag for sanitize runs
         if is_sanitize_run:
             self.is_converting = True
 
-        self._log_debug(f"--- Starting worker thread with {len(tasks)} tasks ---")
-        if self.conversion_thread is None or not self.conversion_thread.is_alive():
-            self.stop_thread.clear()
-            self.conversion_thread = threading.Thread(target=self.conversion_worker, daemon=True)
-            self.conversion_thread.start()
-
-    def conversion_worker(self):
-        while not self.stop_thread.is_set():
-            try:
-                task=self.conversion_queue.get(timeout=1)
-                idx, target_path, use_sanitize = task['idx'], task['target_path'], task['sanitize']
-                input_path = self.files[idx]
-
-                self._log_debug(f"PULLED TASK: Idx={idx}, Target={target_path.name}, Sanitize={use_sanitize}")
+        self._log_debug(f"--- Starting worker pool ({self.workers} workers) with {len(tasks)} tasks ---")
+        self.futures = [self.executor.submit(self.conversion_worker, task) for task in tasks]
 
+    def conversion_worker(self, task):
+        try:
+            idx, input_path, target_path, use_sanitize = task['idx'], task['input_path'], task['target_path'], task['sanitize']
+
+            if self.debug_enabled: self._log_debug(f"PULLED TASK: Idx={idx}, Target={target_path.name}, Sanitize={use_sanitize}")
+
+            if use_sanitize:
+                if self.debug_enabled: self._log_debug(f"SANITIZING {input_path.name}")
+                self._update_status(idx, 'SANITIZING')
+                if not self.imagemagick_cmd: self._update_status(idx,'FAILED',message="ImageMagick not found"); return
+                source_file_for_cjxl = "-"  # Sanitized PNG is streamed into cjxl's stdin
+            else: source_file_for_cjxl = input_path; self._update_status(idx,'CONVERTING')
+
+            # Split the cores between parallel jobs; each cjxl would otherwise start a thread per core.
+            num_threads = max(1, (os.cpu_count() or 1) // self.workers)
+            cmd = [self.cjxl_cmd, str(source_file_for_cjxl), str(target_path), "--effort", str(self.effort), "--num_threads", str(num_threads)]
+            is_jpeg = input_path.suffix.lower() in ['.jpg','.jpeg']
+
+            if is_jpeg and not use_sanitize:
+                lossless_cmd = cmd + ['--lossless_jpeg', '1', '--quiet']
+                if self.debug_enabled: self._log_debug(f"Executing lossless: {lossless_cmd}")
+                result=self._run_cjxl(lossless_cmd)
+                if self.debug_enabled: self._log_debug(f"Lossless Result: code={result.returncode}, stderr={self._stderr_text(result.stderr)}")
+                if result.returncode!=0:
+                    self._log_debug("Lossless failed, falling back to quality.")
+                    quality_cmd = cmd + ['-q', str(self.quality),'--quiet']
+                    if self.debug_enabled: self._log_debug(f"Executing quality: {quality_cmd}")
+                    result=self._run_cjxl(quality_cmd)
+                    if self.debug_enabled: self._log_debug(f"Quality Result: code={result.returncode}, stderr={self._stderr_text(result.stderr)}")
+            else:
+                quality_cmd = cmd + ['--lossless_jpeg', '0', '-q', str(self.quality),'--quiet']
+                if self.debug_enabled: self._log_debug(f"Executing quality (non-JPEG/sanitized): {quality_cmd}")
                 if use_sanitize:
-                    self._log_debug(f"SANITIZING {input_path.name}")
-                    self._update_status(idx, 'SANITIZING')
-                    if not self.imagemagick_cmd: self._update_status(idx,'FAILED',message="ImageMagick not found"); continue
-                    temp_png = Path(tempfile.gettempdir())/f"sanitized_{input_path.name}.png"
-                    sanitize_cmd = [self.imagemagick_cmd, str(input_path), "-strip", str(temp_png)]
-                    result = subprocess.run(sanitize_cmd, capture_output=True, text=True, encoding='utf-8', errors='ignore')
-                    self._log_debug(f"Sanitize Result: code={result.returncode}, stderr={result.stderr.strip()}")
-                    if result.returncode!=0 or not temp_png.exists() or temp_png.stat().st_size==0:
-                        self._update_status(idx,'FAILED',message="Sanitize failed"); temp_png.unlink(missing_ok=True); continue
-                    source_file_for_cjxl = temp_png
-                else: source_file_for_cjxl = input_path
-
-                self._update_status(idx,'CONVERTING')
-
-                cmd = [self.cjxl_cmd, str(source_file_for_cjxl), str(target_path), "--effort", str(self.effort)]
-                is_jpeg = input_path.suffix.lower() in ['.jpg','.jpeg']
-
-                if is_jpeg and not use_sanitize:
-                    lossless_cmd = cmd + ['--lossless_jpeg', '1', '--quiet']
-                    self._log_debug(f"Executing lossless: {lossless_cmd}")
-                    result=subprocess.run(lossless_cmd,capture_output=True,text=True, encoding='utf-8', errors='ignore')
-                    self._log_debug(f"Lossless Result: code={result.returncode}, stderr={result.stderr.strip()}")
-                    if result.returncode!=0:
-                        self._log_debug("Lossless failed, falling back to quality.")
-                        quality_cmd = cmd + ['-q', str(self.quality),'--quiet']
-                        self._log_debug(f"Executing quality: {quality_cmd}")
-                        result=subprocess.run(quality_cmd, capture_output=True,text=True, encoding='utf-8', errors='ignore')
-                        self._log_debug(f"Quality Result: code={result.returncode}, stderr={result.stderr.strip()}")
-                else:
-                    quality_cmd = cmd + ['--lossless_jpeg', '0', '-q', str(self.quality),'--quiet']
-                    self._log_debug(f"Executing quality (non-JPEG/sanitized): {quality_cmd}")
-                    result = subprocess.run(quality_cmd,capture_output=True,text=True, encoding='utf-8', errors='ignore')
-                    self._log_debug(f"Quality Result: code={result.returncode}, stderr={result.stderr.strip()}")
-
-                if use_sanitize: source_file_for_cjxl.unlink(missing_ok=True)
-                if result.returncode == 0 and target_path.exists():
-                    shutil.copystat(input_path, target_path)
-                    self._update_status(idx,'SUCCESS',size_before=input_path.stat().st_size,size_after=target_path.stat().st_size)
-                    if self.delete_originals:
-                        try: input_path.unlink()
-                        except OSError: pass
-                else:
-                    error_msg = result.stderr.strip().splitlines()[-1] if result.stderr else "cjxl error"
-                    self._update_status(idx,'FAILED',message=error_msg); target_path.unlink(missing_ok=True)
-            except queue.Empty: continue
-            except Exception as e:
-                self._log_debug(f"WORKER CRASH: {e}")
-                if 'idx' in locals(): self._update_status(idx,'FAILED',message=f"Worker crash: {type(e).__name__}")
+                    # Status stays SANITIZING for the whole magick | cjxl pipeline
+                    sanitize_result, result = self._run_sanitize_pipeline(input_path, quality_cmd)
+                    if self.debug_enabled: self._log_debug(f"Sanitize Result: code={sanitize_result.returncode}, stderr={self._stderr_text(sanitize_result.stderr)}")
+                else: result = self._run_cjxl(quality_cmd)
+                if self.debug_enabled: self._log_debug(f"Quality Result: code={result.returncode}, stderr={self._stderr_text(result.stderr)}")
+                # A broken pipe only means cjxl stopped reading first; its own error is then the one to report.
+                if use_sanitize and sanitize_result.returncode not in (0, *self._BROKEN_PIPE_RCS):
+                    self._update_status(idx,'FAILED',message="Sanitize failed"); target_path.unlink(missing_ok=True); return
+
+            if result.returncode == 0 and target_path.exists():
+                st = task['src_stat']  # Only timestamps and permission bits matter for the .jxl
+                os.utime(target_path, ns=(st.st_atime_ns, st.st_mtime_ns)); os.chmod(target_path, st.st_mode & 0o777)
+                self._update_status(idx,'SUCCESS',size_before=st.st_size,size_after=target_path.stat().st_size)
+                if self.delete_originals:
+                    try: input_path.unlink()
+                    except OSError: pass
+            else:
+                error_lines = self._stderr_text(result.stderr).splitlines()
+                error_msg = error_lines[-1] if error_lines else "cjxl error"
+                self._update_status(idx,'FAILED',message=error_msg); target_path.unlink(missing_ok=True)
+        except Exception as e:
+            if self.debug_enabled: self._log_debug(f"WORKER CRASH: {e}", flush=True)
+            if 'idx' in locals(): self._update_status(idx,'FAILED',message=f"Worker crash: {type(e).__name__}")
+
+    def _run_sanitize_pipeline(self, input_path, cjxl_cmd):
+        """Runs `magick <input> -strip png:-` piped straight into cjxl's stdin, with no temp file."""
+        sanitize_cmd = [self.imagemagick_cmd, str(input_path), "-strip", "png:-"]
+        # magick's stderr goes to a temp file: an unread pipe could fill up and stall the whole pipeline.
+        with tempfile.TemporaryFile() as magick_err_file:
+            magick = subprocess.Popen(sanitize_cmd, stdout=subprocess.PIPE, stderr=magick_err_file)
+            try: cjxl = subprocess.Popen(cjxl_cmd, stdin=magick.stdout, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+            except OSError: magick.kill(); magick.wait(); raise
+            finally: magick.stdout.close()  # cjxl owns the read end now; magick gets SIGPIPE if cjxl exits early
+            _, cjxl_err = cjxl.communicate()
+            magick.wait(); magick_err_file.seek(0); magick_err = magick_err_file.read()
+        return (subprocess.CompletedProcess(sanitize_cmd, magick.returncode, None, magick_err),
+                subprocess.CompletedProcess(cjxl_cmd, cjxl.returncode, None, cjxl_err))
+
+    def _run_cjxl(self, cmd):
+        # stdout is never used; stderr stays raw bytes and is only decoded on failure or for the debug log.
+        return subprocess.run(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+
+    def _stderr_text(self, stderr):
+        return stderr[-4096:].decode('utf-8', errors='ignore').strip() if stderr else ""
 
     def handle_input(self, key, visible_files):
-        self.status_message = ""; h,w=self.stdscr.getmaxyx(); max_rows=h-5
+        self.status_message = ""; h,w=self.stdscr.getmaxyx(); max_rows=h-5; self.needs_redraw = True
         char_key = chr(key) if 32<=key<=126 else None
 
         if key in [curses.KEY_UP,ord('k')] and self.current_row>0: self.current_row-=1
@@ -461,19 +574,23 @@ class JxlConverterTUI:
         elif key == ord(' '):
             if self.current_row < len(visible_files):
                 original_idx = visible_files[self.current_row][0]
-                if original_idx in self.selected: self.selected.remove(original_idx)
-                else: self.selected.add(original_idx)
-        elif char_key=='a': self.selected = {idx for idx, path in visible_files}
-        elif char_key=='A': self.selected.clear()
+                if original_idx in self.selected: self._remove_index(self.selected, self.selected_sorted, original_idx)
+                else: self._add_index(self.selected, self.selected_sorted, original_idx)
+        elif char_key=='a': self.selected_sorted = [idx for idx, path in visible_files]; self.selected = set(self.selected_sorted)
+        elif char_key=='A': self.selected.clear(); self.selected_sorted.clear()
         elif key in [curses.KEY_ENTER,10]: self._start_conversion_session()
+        elif key == curses.KEY_F5 and self.is_converting: self.show_message("Can't refresh the file list while converting.", 3)
         elif key == curses.KEY_F5: self.load_files()
         elif char_key in ['F','f'] and self.failed_indices:
             self.show_only_failed = not self.show_only_failed; self.current_row = self.scroll_offset = 0
         elif char_key in ['B','b']:
             self.debug_enabled = not self.debug_enabled
+            if not self.debug_enabled: self._flush_debug_log(close=True)
             self.show_message(f"Debug logging {'ENABLED' if self.debug_enabled else 'DISABLED'}")
         elif char_key in ['Q','q']: self.set_quality()
         elif char_key in ['E','e']: self.set_effort()
+        elif char_key in ['W','w']: self.set_workers()
+        elif char_key in ['R','r'] and self.is_converting: self.show_message("Can't toggle recursive while converting.", 3)
         elif char_key in ['R','r']: self.recursive=not self.recursive; self.load_files()
         elif char_key in ['O','o']: self.set_output_dir()
         elif char_key in ['D','d']: self.delete_originals=not self.delete_originals
@@ -491,6 +608,13 @@ class JxlConverterTUI:
         if new_val and new_val.isdigit() and 1<=int(new_val)<=9:
             self.effort=int(new_val); self.show_message(f"Effort set to {self.effort}")
         elif new_val is not None: self.show_message("Effort must be between 1 and 9.", 4)
+    def set_workers(self):
+        if self.is_converting: self.show_message("Workers can't be changed while converting.", 3); return
+        new_val = InputDialog(self.stdscr, "Workers (1-64)", self.workers).run()
+        if new_val and new_val.isdigit() and 1<=int(new_val)<=64:
+            self.workers=int(new_val); self.show_message(f"Workers set to {self.workers}")
+            self.executor.shutdown(wait=False); self.executor = self._create_executor()
+        elif new_val is not None: self.show_message("Workers must be between 1 and 64.", 4)
     def set_output_dir(self):
         prompt = "Output Dir (blank=Same as Source)"; current = "" if self.output_dir is None else str(self.output_dir)
         new_val = InputDialog(self.stdscr, prompt, current).run()
@@ -501,19 +625,28 @@ class JxlConverterTUI:
     def show_message(self, msg, color=5): self.status_message = msg; self.status_message_color = color
 
     def run(self):
-        curses.curs_set(0); self.stdscr.nodelay(True)
+        curses.curs_set(0)
         if not self.cjxl_cmd: self.show_message("FATAL: cjxl not found in PATH. Install libjxl-tools.", 4)
+        try: self._event_loop()
+        finally:
+            # Drop tasks that have not started yet; running cjxl processes are left to finish.
+            for future in self.futures: future.cancel()
+            self.executor.shutdown(wait=False); self._flush_debug_log(close=True)
+
+    def _event_loop(self):
         while True:
-            # Collect all pending keys and keep only the last navigation key
+            # Wait up to one frame for input (longer when idle), then collect any other pending keys
+            # and keep only the last navigation key
+            self.stdscr.timeout(20 if self.is_converting else 200)
             keys = []
-            while True:
-                key = self.stdscr.getch()
-                if key == -1:
-                    break
+            key = self.stdscr.getch()
+            self.stdscr.timeout(0)
+            while key != -1:
                 keys.append(key)
+                key = self.stdscr.getch()
 
             if keys: # Any user input clears the post-conversion summary.
-                self.last_conversion_summary = ""
+                self.last_conversion_summary = ""; self.needs_redraw = True
 
             # Process non-navigation keys first
             non_nav_keys = []
@@ -547,6 +680,8 @@ class JxlConverterTUI:
                 self.handle_input(last_nav_key, visible_files_before_input)
 
             self._process_status_queue()
+            # While converting, the elapsed-time counter in the header changes every frame
+            if not (self.needs_redraw or self.is_converting): continue
 
             visible_files = self.get_visible_files()
             if self.current_row >= len(visible_files): self.current_row = max(0, len(visible_files) - 1)
@@ -554,10 +689,7 @@ class JxlConverterTUI:
             self.stdscr.erase(); h,w=self.stdscr.getmaxyx()
             if h<10 or w<80: self.stdscr.addstr(0,0,"Terminal too small...")
             else: self.draw_header(h,w); self.draw_file_list(h,w,visible_files); self.draw_status_bar(h,w); self.draw_footer(h,w)
-            self.stdscr.refresh(); time.sleep(0.02)
-
-        self.stop_thread.set()
-        if self.conversion_thread and self.conversion_thread.is_alive(): self.conversion_thread.join()
+            self.stdscr.refresh(); self.needs_redraw = False
 
 def main_wrapper(stdscr, args):
     try: JxlConverterTUI(stdscr, args.directory).run()